@@ -40,17 +40,54 @@ WindowPos
     @version:  20220821
 """
 
-import argparse
-import copy
+import functools
 import getpass
-import math
+import glob
+import logging
 import os
+import pickle
 import re
+import selectors
+import socket
 import subprocess
 import sys
-from time import sleep
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+from time import monotonic, sleep
 from subprocess import Popen, PIPE
 
+try:
+    from Xlib import X as xlib_X
+    from Xlib import display as xlib_display
+    from Xlib import protocol as xlib_protocol
+    from Xlib.ext import randr as xlib_randr
+except ImportError:  # python-xlib is optional. Without it we fall back to calling the X utility binaries.
+    xlib_X = None
+    xlib_display = None
+    xlib_protocol = None
+    xlib_randr = None
+
+try:
+    import numpy
+except ImportError:  # numpy is optional. Only worth it for hit-testing big multi-monitor rigs.
+    numpy = None
+
+try:
+    from detach import call as _detached_call  # Needs Python 3.8+
+except ImportError:  # detach is optional. Without it we launch apps with Popen(start_new_session=True).
+    _detached_call = None
+
+
+# Chatty diagnostics sit at DEBUG so the hot path does no stdout syscalls unless you ask for
+# them with -v / --verbose (or the WINDOWPOS_DEBUG env var, handy when a keybinding misbehaves
+# and you can't easily add flags to it). Errors and warnings still reach the terminal.
+logging.basicConfig(
+    level=logging.DEBUG if os.environ.get("WINDOWPOS_DEBUG") else logging.WARNING,
+    format="%(levelname)s: %(message)s"
+)
+logger = logging.getLogger("windowpos")
+
 
 # How much space on each screen is consumed by always-on-top panels / margins etc. Uses CSS syntax: (top, right, bottom, left)
 SCREEN_MARGINS = {
@@ -71,6 +108,8 @@ launcher_commmands = {
     "java": "pycharm",  # Yes this is nasty. That's because PyCharm massively obfuscates its actualy application window.
     "mate-terminal": "mate-terminal"
 }
+# Case-insensitive view of the above, built once so each lookup is a single dict probe:
+_launcher_commmands_ci = {str(launcher_name).lower(): launcher_command for launcher_name, launcher_command in launcher_commmands.items()}
 
 
 # You can configure presets for a load of windows here. Run this by calling this script with the -l or --layout argument. e.g. -l=dev
@@ -83,69 +122,357 @@ layouts = {
         {"application_name": "Rambox", "nth_instance_of_application": 0, "target_monitor_name": "DP-4", "target_desktop_id": 0, "target_position": "right", "spawn_missing": True},
     )
 }
+# Freeze the strategies so nothing can mutate a layout definition at runtime - which is
+# what lets run_layout merge them into per-window kwargs without any defensive copying:
+layouts = {layout_name: tuple(MappingProxyType(dict(strategy)) for strategy in layout_list) for layout_name, layout_list in layouts.items()}
+# Case-insensitive view of the above, built once so each lookup is a single dict probe:
+_layouts_ci = {str(layout_name).strip().lower(): layout_list for layout_name, layout_list in layouts.items()}
 
 
 class WindowPositionException(Exception):
     pass
 
 
-# Regexes
-re_dims = re.compile(r"([0-9]+)x([0-9]+)\+([-0-9]+)\+([-0-9]+).*$")
-re_win_name = re.compile(r'^.*Window\sid:\s([A-Fa-f0-9]+x[A-Fa-f0-9]+)\s"(.*)".*$', re.MULTILINE)
-re_win_x = re.compile(r'^.*Absolute\supper\-left\sX:\s+([0-9]+).*$', re.MULTILINE)
-re_win_y = re.compile(r'^.*Absolute\supper\-left\sY:\s+([0-9]+).*$', re.MULTILINE)
-re_win_w = re.compile(r'^.*Width:\s+([0-9]+).*$', re.MULTILINE)
-re_win_h = re.compile(r'^.*Height:\s+([0-9]+).*$', re.MULTILINE)
-re_getwindowgeometry = re.compile(r'^\s+([a-zA-Z\s\d]+):\s?([\-+\d]+)[x|,]([\-+\d]+)(?:\s\(?([a-zA-Z\s\-\d]+):\s*(\d+)+\)?)?')
-re_getchildwindowgeometry = re.compile(r'^\s+(0x\d+)\s+"([a-zA-Z-_\d\s]+)":\s+\([a-zA-Z\d\-_:"\s]+\)\s+([\-+\d]+)x([-|+]?\d+)[+|-]-?\d+[+|-]-?\d+\s*([+|-]\d+)([+|-]\d+)')
+# Regexes. All raw strings (no reliance on benign escapes) and re.ASCII - everything we parse
+# is ASCII tool output, so skip the Unicode property tables when matching digit classes.
+# Each is compiled lazily on first use (and memoised): they only matter on the subprocess
+# fallback paths, and this script's startup latency is what a keybinding user feels.
+
+@functools.lru_cache(maxsize=1)
+def _re_dims():
+    """Geometry token on an xrandr connected line: WxH+X+Y"""
+    return re.compile(r"(\d+)x(\d+)\+(-?\d+)\+(-?\d+)", re.ASCII)
+
+
+@functools.lru_cache(maxsize=1)
+def _re_win():
+    """Pulls id, title, x, y, w, h out of xwininfo output in one pass"""
+    return re.compile(
+        # The title capture is line-bounded and greedy so it runs to the LAST quote on the
+        # line - titles can themselves contain quotes:
+        r'Window\sid:\s([A-Fa-f0-9]+x[A-Fa-f0-9]+)\s"([^\n]*)"'
+        r'.*?Absolute\supper-left\sX:\s+(\d+)'
+        r'.*?Absolute\supper-left\sY:\s+(\d+)'
+        r'.*?Width:\s+(\d+)'
+        r'.*?Height:\s+(\d+)',
+        re.DOTALL | re.ASCII
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def _re_getwindowgeometry():
+    """Property lines of xdotool getwindowgeometry output"""
+    return re.compile(r'^\s+([a-zA-Z\s\d]+):\s?([\-+\d]+)[x|,]([\-+\d]+)(?:\s\(?([a-zA-Z\s\-\d]+):\s*(\d+)+\)?)?', re.ASCII)
+
+
+@functools.lru_cache(maxsize=1)
+def _re_getchildwindowgeometry():
+    """Child entries of xwininfo -children output"""
+    return re.compile(r'^\s+(0x\d+)\s+"([a-zA-Z-_\d\s]+)":\s+\([a-zA-Z\d\-_:"\s]+\)\s+([\-+\d]+)x([-|+]?\d+)[+|-]-?\d+[+|-]-?\d+\s*([+|-]\d+)([+|-]\d+)', re.ASCII)
 
 
 ACTIVE_WINDOW = ":ACTIVE:"  # Special string used internally to flag when the user is interested in the active window
 
 
-def get_screens_and_positions():
+def _build_position_calculator(horizontal=None, vertical=None):
+    """
+    Builds the target-rectangle function for one canonical position.
+    :param horizontal: "left", "right" or None for full width
+    :param vertical: "top", "bottom" or None for full height
+    :return: function (monitor, margins) -> (xoff, yoff, width, height). Margins are CSS order.
     """
-    Gets all the screens and their positions via Xrandr. This allows us to know where to tile stuff
+    def calculate(monitor, margins):
+        # Integer division throughout: under Python 3, / yields floats which wmctrl's -e
+        # argument (and EWMH message data) reject:
+        width = (monitor["w"] // 2 if horizontal else monitor["w"]) - margins[1] - margins[3]
+        height = (monitor["h"] // 2 if vertical else monitor["h"]) - margins[0] - margins[2]
+        if horizontal == "right":
+            xoff = monitor['x'] + monitor['w'] - width - margins[1]
+        else:
+            xoff = monitor['x'] + margins[3]
+        if vertical == "bottom":
+            yoff = monitor['y'] + monitor['h'] - height - margins[2]
+        else:
+            yoff = monitor['y'] + margins[0]
+        return xoff, yoff, width, height
+    return calculate
+
+
+# The set of legal positions is tiny, so the whole target computation is a table lookup keyed
+# on the set of recognised position keywords. Unrecognised combos fall back to full screen.
+HORIZONTAL_FLAGS = frozenset(("left", "right"))
+VERTICAL_FLAGS = frozenset(("top", "bottom"))
+POSITION_FLAGS = frozenset(("top", "bottom", "left", "right", "max"))
+POSITIONS = {
+    frozenset(): _build_position_calculator(),
+    frozenset(("max",)): _build_position_calculator(),
+    frozenset(("left",)): _build_position_calculator(horizontal="left"),
+    frozenset(("right",)): _build_position_calculator(horizontal="right"),
+    frozenset(("top",)): _build_position_calculator(vertical="top"),
+    frozenset(("bottom",)): _build_position_calculator(vertical="bottom"),
+    frozenset(("top", "left")): _build_position_calculator(horizontal="left", vertical="top"),
+    frozenset(("top", "right")): _build_position_calculator(horizontal="right", vertical="top"),
+    frozenset(("bottom", "left")): _build_position_calculator(horizontal="left", vertical="bottom"),
+    frozenset(("bottom", "right")): _build_position_calculator(horizontal="right", vertical="bottom"),
+}
+
+MONITOR_CACHE_FILENAME = "windowpos_monitors.pkl"  # Lives in XDG_RUNTIME_DIR so it dies with the session
+DAEMON_SOCKET_FILENAME = "windowpos.sock"  # Where the daemon listens for commands
+DAEMON_DEBOUNCE_SECONDS = 1.0 / 120  # Coalesce keybind autorepeat spam. 120Hz is imperceptible to humans.
+XDOTOOL_CONCURRENT_SEARCHES = 8  # Cap on simultaneous per-pid xdotool searches, matching run_layout's worker cap
+
+# In-process monitor cache. A layout run calls get_screens_and_positions() several times per
+# window; this makes every call after the first free. The daemon subscribes to
+# RRScreenChangeNotify and invalidates on hotplug; one-shot runs are too brief to go stale.
+_screens_memo = None
+# The monitor rectangles as a numpy matrix, kept as (screens, array) and rebuilt only when
+# the screens list changes - converting the dicts per hit-test would cost more than the
+# vectorised containment check saves:
+_screens_xywh_memo = None
+
+
+def invalidate_screens_cache():
+    """
+    Forgets the cached monitor layout - both the in-process memo and the on-disk copy - so the
+    next call re-enumerates. Call after a monitor change if you're driving this module as a
+    library. The disk cache has to go too: RandR changes like repositioning or a resolution
+    switch don't touch /sys/class/drm/*/status, so the config stamp would happily revalidate
+    a stale pickle forever.
     :return:
     """
-    screens = []
-    p_xrandr = Popen(["xrandr"], stdout=PIPE)
-    p_mons = Popen(["grep", "-w", "connected"], stdin=p_xrandr.stdout, stdout=PIPE)
-    monitor_text, err = p_mons.communicate()
-
-    # Parse the monitors into dicts
-    for monitor_line in monitor_text.split("\n"):
-        print(monitor_line)
-        monitor_dict = {}
-        words = monitor_line.split(" ")
-        monitor_dict['name'] = words[0]  # First item is ALWAYS the monitor name
-        dims = re_dims.findall(monitor_line)
+    global _screens_memo, _screens_xywh_memo
+    _screens_memo = None
+    _screens_xywh_memo = None
+    cache_path = _get_monitor_cache_path()
+    if cache_path is not None:
         try:
-            dims = dims[0]  # Matches all sit inside a tuple, inside a list!!
-        except IndexError:
-            # There's no screen on this line!
+            os.unlink(cache_path)
+        except OSError:
+            pass  # No cache file is a fine outcome here
+
+
+def _get_monitor_cache_path():
+    """
+    Where we stash the cached monitor layout between invocations. Only XDG_RUNTIME_DIR is
+    trusted: it's per-user and mode 0700. Unpickling from a predictable path in a
+    world-writable /tmp would let any local user feed us a malicious pickle, so without a
+    runtime dir we simply don't cache to disk.
+    :return: <str> path to the cache file, or None if there's no private place to keep one
+    """
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if not runtime_dir:
+        return None
+    return os.path.join(runtime_dir, MONITOR_CACHE_FILENAME)
+
+
+def _get_monitor_config_stamp():
+    """
+    Cheap token identifying the current monitor configuration. The kernel touches
+    /sys/class/drm/*/status whenever a monitor is plugged or unplugged, so the max mtime changes
+    exactly when our cached layout goes stale - no need to ask X at all.
+    :return: <float> stamp, or None if we can't tell (in which case don't cache)
+    """
+    status_files = glob.glob("/sys/class/drm/*/status")
+    if status_files:
+        try:
+            return max(os.path.getmtime(status_file) for status_file in status_files)
+        except OSError:
             pass
-        else:
-            print(dims)
-            monitor_dict["w"] = int(dims[0])
-            monitor_dict["h"] = int(dims[1])
-            monitor_dict["x"] = int(dims[2])
-            monitor_dict["y"] = int(dims[3])
+    return None
+
+
+def _load_monitor_cache():
+    """
+    Loads the cached monitor layout from disk
+    :return: (stamp, screens) or (None, None) if no usable cache
+    """
+    cache_path = _get_monitor_cache_path()
+    if cache_path is None:
+        return None, None
+    try:
+        with open(cache_path, "rb") as f:
+            stamp, screens = pickle.load(f)
+        return stamp, screens
+    except (IOError, OSError, ValueError, EOFError, pickle.UnpicklingError):
+        return None, None
+
+
+def _save_monitor_cache(stamp, screens):
+    """
+    Saves the monitor layout to disk so the next invocation can skip enumerating monitors
+    :param stamp: the config stamp the layout was captured under
+    :param screens: the parsed screens list
+    :return:
+    """
+    cache_path = _get_monitor_cache_path()
+    if cache_path is None:
+        return
+    try:
+        with open(cache_path, "wb") as f:
+            pickle.dump((stamp, screens), f)
+    except (IOError, OSError, pickle.PicklingError):
+        pass  # Cache is an optimisation only. Never let it break a window move.
+
+
+def _get_screens_and_positions_xlib():
+    """
+    Gets all the screens and their positions by asking the X server directly via RandR.
+    Uses XRRGetScreenResourcesCurrent, which answers from the server's cached state rather than
+    forcing a hardware poll (XRRGetScreenResources can stall X for hundreds of ms).
+    :return: [{'name': 'DP-4', 'w': 2560, 'h': 1440, 'x': 1291, 'y': 0}]
+    """
+    screens = []
+    disp = xlib_display.Display()
+    try:
+        root = disp.screen().root
+        resources = xlib_randr.get_screen_resources_current(root)
+        for output in resources.outputs:
+            output_info = xlib_randr.get_output_info(root, output, resources.config_timestamp)
+            if not output_info.crtc:  # Disconnected, or connected but not driving a CRTC
+                continue
+            crtc_info = xlib_randr.get_crtc_info(root, output_info.crtc, resources.config_timestamp)
+            monitor_dict = {
+                'name': str(output_info.name),
+                "w": int(crtc_info.width),
+                "h": int(crtc_info.height),
+                "x": int(crtc_info.x),
+                "y": int(crtc_info.y),
+            }
             screens.append(monitor_dict)
-    print(screens)
+    finally:
+        disp.close()
+    logger.debug(screens)
+    return screens
+
+
+def _get_screens_and_positions_xrandr():
+    """
+    Gets all the screens and their positions by parsing xrandr output. Fallback for when python-xlib
+    is not installed. Uses --current so xrandr reads the cached configuration instead of re-polling
+    the hardware, and filters the "connected" lines in Python rather than spawning grep.
+    :return: [{'name': 'DP-4', 'w': 2560, 'h': 1440, 'x': 1291, 'y': 0}]
+    """
+    screens = []
+    p_xrandr = Popen(["xrandr", "--current"], stdout=PIPE, shell=False, text=True)
+    monitor_text, err = p_xrandr.communicate()
+
+    # Parse the monitors into dicts. Hoist the bound method so the loop does one attribute
+    # lookup total, not one per line:
+    find_dims = _re_dims().search
+    for monitor_line in monitor_text.splitlines():
+        if " connected" not in monitor_line:
+            continue
+        logger.debug(monitor_line)
+        words = monitor_line.split(" ")
+        # The geometry is a fixed single WxH+X+Y token on these lines, so plain string splits
+        # find it without invoking the regex engine:
+        geometry = None
+        for token in words[1:]:
+            if "x" not in token or "+" not in token:
+                continue
+            try:
+                wh, x_offset, y_offset = token.split("+", 2)
+                w, h = wh.split("x")
+                geometry = (int(w), int(h), int(x_offset), int(y_offset))
+            except ValueError:
+                continue  # Not the geometry token after all (e.g. a rotation flag)
+            break
+        if geometry is None:
+            dims = find_dims(monitor_line)  # Regex fallback for oddly-formed lines
+            if dims is None:
+                continue  # There's no screen geometry on this line!
+            geometry = tuple(int(group) for group in dims.groups())
+        logger.debug(geometry)
+        monitor_dict = {
+            'name': words[0],  # First item is ALWAYS the monitor name
+            "w": geometry[0],
+            "h": geometry[1],
+            "x": geometry[2],
+            "y": geometry[3],
+        }
+        screens.append(monitor_dict)
+    logger.debug(screens)
+    return screens
+
+
+def get_screens_and_positions(use_cache=True):
+    """
+    Gets all the screens and their positions. This allows us to know where to tile stuff.
+    Monitor layouts change maybe once a day but this script runs on every keybind press, so the
+    parsed layout is cached on disk and reused while the config stamp matches. On a cache miss we
+    prefer a direct RandR query via python-xlib (no subprocesses), falling back to the xrandr
+    binary if python-xlib is unavailable or misbehaves.
+    :param use_cache: <bool> set False to force re-enumeration
+    :return: [{'name': 'DP-4', 'w': 2560, 'h': 1440, 'x': 1291, 'y': 0}]
+    """
+    global _screens_memo
+    if use_cache and _screens_memo is not None:
+        return _screens_memo  # Within one process the layout can't go stale on us; the daemon also invalidates on RandR events
+
+    stamp = _get_monitor_config_stamp()
+    if use_cache and stamp is not None:
+        cached_stamp, cached_screens = _load_monitor_cache()
+        if cached_screens and cached_stamp == stamp:
+            _screens_memo = cached_screens  # So later calls this run skip the stat+unpickle too
+            return cached_screens
+
+    if xlib_display is not None:
+        try:
+            screens = _get_screens_and_positions_xlib()
+        except Exception as e:
+            logger.warning("RandR query via python-xlib failed ({}). Falling back to xrandr.".format(e))
+            screens = _get_screens_and_positions_xrandr()
+    else:
+        screens = _get_screens_and_positions_xrandr()
+
+    # Resolve each monitor's panel margins once at enumeration time, so the per-reposition
+    # path is a plain key read rather than a lookup against SCREEN_MARGINS:
+    for monitor in screens:
+        monitor["margins"] = SCREEN_MARGINS.get(str(monitor.get("name")), (0, 0, 0, 0))
+
+    if stamp is not None and screens:
+        _save_monitor_cache(stamp, screens)
+    if screens:
+        _screens_memo = screens
     return screens
 
 
+def _get_window_id_of_active_window_xlib():
+    """
+    Returns the id of the active window by reading _NET_ACTIVE_WINDOW off the root window
+    :return: <int> window id, or None if the WM hasn't set one
+    """
+    disp = xlib_display.Display()
+    try:
+        root = disp.screen().root
+        prop = root.get_full_property(disp.intern_atom('_NET_ACTIVE_WINDOW'), xlib_X.AnyPropertyType)
+        if not prop or not prop.value:
+            return None
+        return int(prop.value[0])
+    finally:
+        disp.close()
+
+
 def get_window_id_of_active_window():
     """
-    Returns the id of an active window
+    Returns the id of an active window. Asks the X server directly where python-xlib is
+    available, otherwise shells out to xdotool.
     :return:
     """
-    p_xdotool = Popen(["xdotool", 'getactivewindow'], stdout=PIPE)
+    if xlib_display is not None:
+        try:
+            active_window = _get_window_id_of_active_window_xlib()
+        except Exception as e:
+            logger.warning("Active window query via python-xlib failed ({}). Falling back to xdotool.".format(e))
+        else:
+            if active_window is not None:
+                logger.debug("Active window: {}".format(active_window))
+                return active_window
+    p_xdotool = Popen(["xdotool", 'getactivewindow'], stdout=PIPE, text=True)
     active_window, err = p_xdotool.communicate()
-    print("Active window: {}".format(active_window))
+    logger.debug("Active window: {}".format(active_window))
     if err:
-        print("ERROR: {}".format(err))
+        logger.error("{}".format(err))
     return active_window
 
 
@@ -162,44 +489,69 @@ def cast_safe(item, var_type, *cast_args, **cast_kwargs):
     try:
         return var_type(item, *cast_args, **cast_kwargs)
     except (ValueError, TypeError) as e:
-        print("{}->{}: {}".format(item, var_type, e))
+        logger.debug("{}->{}: {}".format(item, var_type, e))
     return str(var_type)
 
 
-def get_window_geometry(window_id):
+def _get_window_geometry_xlib(window_id):
     """
-    Returns the window geometry of a specific window
+    Returns the window geometry of a specific window by asking the X server directly
     :param window_id:
-    :return: {
-        "Window": window_id,
-        "Position": {
-            "x": 150,
-            "y": 150,
-            "screen": 0
-        }
-        "Geometry": {
-            "w": 1010,
-            "h": 598
+    :return: same shape as get_window_geometry()
+    """
+    window_id = int(window_id)
+    disp = xlib_display.Display()
+    try:
+        root = disp.screen().root
+        win = disp.create_resource_object('window', window_id)
+        geometry = win.get_geometry()
+        coords = root.translate_coords(win, 0, 0)
+        out_info = {
+            "Window": window_id,
+            "Position": {
+                "x": int(coords.x),
+                "y": int(coords.y),
+            },
+            "Geometry": {
+                "w": int(geometry.width),
+                "h": int(geometry.height),
+            },
         }
-    }
+    finally:
+        disp.close()
+    logger.debug(out_info)
+    return out_info
+
+
+def _get_window_geometry_xdotool(window_id):
+    """
+    Returns the window geometry of a specific window by parsing xdotool output. Fallback for
+    when python-xlib is not installed.
+    :param window_id:
+    :return: same shape as get_window_geometry()
     """
     window_id = int(window_id)
-    p_xdotool = Popen(["xdotool", 'getwindowgeometry', str(window_id)], stdout=PIPE)
+    p_xdotool = Popen(["xdotool", 'getwindowgeometry', str(window_id)], stdout=PIPE, text=True)
     window_geometry, err = p_xdotool.communicate()
     if err:
-        print("ERROR: {}".format(err))
+        logger.error("{}".format(err))
     if not window_geometry:
         return {}
     out_info = {}
     lines = window_geometry.split("\n")
+    find_geometry = _re_getwindowgeometry().findall
     for line in lines:
-        line_matches = re_getwindowgeometry.findall(line)
+        # Cheap guard before the regex: property lines are indented and contain a colon.
+        # Keeps the backtracking-prone pattern away from lines that can never match.
+        if not line.startswith(" ") or ":" not in line:
+            continue
+        line_matches = find_geometry(line)
         if not line_matches:
             continue
         try:
             geo_property, x_or_w, y_or_h, supplementary_property, supplementary_property_value = line_matches[0]
         except (IndexError, ValueError) as e:
-            print("{}: {}".format(e.__class__.__name__, e))
+            logger.debug("{}: {}".format(e.__class__.__name__, e))
             continue  # Unparseable line
         geo_property = str(geo_property).strip()
         if str(geo_property).lower().startswith("position"):
@@ -214,44 +566,108 @@ def get_window_geometry(window_id):
         if str(supplementary_property).strip():
             geo_property_dict[clean_supplementary_property_key] = cast_safe(supplementary_property_value, int)
         out_info[geo_property] = geo_property_dict
-        print(out_info)
+        logger.debug(out_info)
     return out_info
 
 
-def get_children_window_geometry(parent_window_id):
+def get_window_geometry(window_id):
+    """
+    Returns the window geometry of a specific window. Asks the X server directly where
+    python-xlib is available, otherwise shells out to xdotool.
+    :param window_id:
+    :return: {
+        "Window": window_id,
+        "Position": {
+            "x": 150,
+            "y": 150,
+            "screen": 0
+        }
+        "Geometry": {
+            "w": 1010,
+            "h": 598
+        }
+    }
     """
-    Gets the geometry of child windows via xwininfo -id 23068752 -children
+    if xlib_display is not None:
+        try:
+            return _get_window_geometry_xlib(window_id)
+        except Exception as e:
+            logger.warning("Window geometry query via python-xlib failed ({}). Falling back to xdotool.".format(e))
+    return _get_window_geometry_xdotool(window_id)
+
+
+def _get_children_window_geometry_xlib(parent_window_id):
+    """
+    Gets the geometry of child windows by walking the window tree on the X server directly
     :param parent_window_id:
-    :return:
+    :return: [(<hex id>, <int width>, <int height>)]
+    """
+    parent_window_id = int(parent_window_id)
+    disp = xlib_display.Display()
+    try:
+        parent = disp.create_resource_object('window', parent_window_id)
+        out_children_window_geometry = []
+        for child in parent.query_tree().children:
+            geometry = child.get_geometry()
+            out_children_window_geometry.append((hex(child.id), int(geometry.width), int(geometry.height)))
+    finally:
+        disp.close()
+    return out_children_window_geometry
+
+
+def _get_children_window_geometry_xwininfo(parent_window_id):
+    """
+    Gets the geometry of child windows via xwininfo -id 23068752 -children. Fallback for when
+    python-xlib is not installed.
+    :param parent_window_id:
+    :return: [(<hex id>, <int width>, <int height>)]
     """
     parent_window_id = int(parent_window_id)
-    p_xdotool = Popen(["xwininfo", '-id', str(parent_window_id), '-children'], stdout=PIPE, stderr=PIPE)
+    p_xdotool = Popen(["xwininfo", '-id', str(parent_window_id), '-children'], stdout=PIPE, stderr=PIPE, text=True)
     children_window_geometry, err = p_xdotool.communicate()
-    print(children_window_geometry)
+    logger.debug(children_window_geometry)
     if err:
-        print("ERROR: {}".format(err))
+        logger.error("{}".format(err))
     lines = children_window_geometry.split("\n")
     out_children_window_geometry = []
+    find_child_geometry = _re_getchildwindowgeometry().findall
     for line in lines:
-        line_matches = re_getchildwindowgeometry.findall(line)
+        if "0x" not in line:
+            continue  # Cheap guard: child entries always carry a hex window id
+        line_matches = find_child_geometry(line)
         if not line_matches:
             continue
         try:
             window_hex_id, window_name, width, height, x_offset, y_offset = line_matches[0]
         except (IndexError, ValueError) as e:
-            print("{}: {}".format(e.__class__.__name__, e))
+            logger.debug("{}: {}".format(e.__class__.__name__, e))
             continue  # Unparseable line
-        out_children_window_geometry.append((window_hex_id, width, height))
+        out_children_window_geometry.append((window_hex_id, cast_safe(width, int), cast_safe(height, int)))
     return out_children_window_geometry
 
 
+def get_children_window_geometry(parent_window_id):
+    """
+    Gets the geometry of child windows. Asks the X server directly where python-xlib is
+    available, otherwise shells out to xwininfo.
+    :param parent_window_id:
+    :return: [(<hex id>, <int width>, <int height>)]
+    """
+    if xlib_display is not None:
+        try:
+            return _get_children_window_geometry_xlib(parent_window_id)
+        except Exception as e:
+            logger.warning("Child window query via python-xlib failed ({}). Falling back to xwininfo.".format(e))
+    return _get_children_window_geometry_xwininfo(parent_window_id)
+
+
 def filter_to_large_enough_windows(window_ids):
     """
     Return the geometry of large enough windows. Recursive into children by one layer.
     :param window_ids:
     :return: [<id>, <id>]
     """
-    print(window_ids)
+    logger.debug(window_ids)
     WIDTH_THRESHOLD = 200
     HEIGHT_THRESHOLD = 200
     real_windows = []
@@ -265,9 +681,9 @@ def filter_to_large_enough_windows(window_ids):
         else:
             if width > WIDTH_THRESHOLD and height > HEIGHT_THRESHOLD:
                 real_windows.append(window_id)
-            else:
-                pass
-            # Now look at children (just one layer)
+                continue  # Parent is plainly a real window - no need to go looking at children
+            # Parent was too small (probably an icon/mask), so look at children (just one layer)
+            # in case the real window hangs off it:
             children_window_geometry_list = get_children_window_geometry(window_id)
             for window_hex_id, width, height in children_window_geometry_list:
                 if width > WIDTH_THRESHOLD and height > HEIGHT_THRESHOLD:
@@ -290,33 +706,34 @@ def get_window_ids_of_application(application_name=None, process_id=None, filter
     """
     window_ids_string_list = []
     if process_id:
-        p_xdotool = Popen(["xdotool", 'search', '--pid', str(process_id)], stdout=PIPE)
+        p_xdotool = Popen(["xdotool", 'search', '--pid', str(process_id)], stdout=PIPE, text=True)
         str_window_ids, err = p_xdotool.communicate()
         window_ids_string_list.append(str_window_ids)
     elif application_name:
         # We search our processlist first
         current_user = str(getpass.getuser())
-        p_get_pid = Popen(["pgrep", "-u", current_user, "-i", str(application_name)], stdout=PIPE)
+        p_get_pid = Popen(["pgrep", "-u", current_user, "-i", str(application_name)], stdout=PIPE, text=True)
         pids, err = p_get_pid.communicate()
-        pids = str(pids).strip().split("\n")
-        pids = filter(bool, pids)
+        pids = [pid.strip() for pid in pids.strip().split("\n") if pid.strip()]
         if pids:
-            print("Pids for {}: {}".format(application_name, pids))
-            for pid in pids:
-                if not str(pid).strip():
-                    continue
-                p_xdotool = Popen(["xdotool", 'search', '--pid', str(pid).strip()], stdout=PIPE)
-                str_window_ids, err = p_xdotool.communicate()
-                window_ids_string_list.append(str_window_ids)
+            logger.debug("Pids for {}: {}".format(application_name, pids))
+            # Launch the per-pid searches concurrently so they overlap rather than queue,
+            # but in bounded batches - pgrep -i on something like Chromium can match dozens
+            # of helper processes and we don't want an unbounded fork storm:
+            for batch_start in range(0, len(pids), XDOTOOL_CONCURRENT_SEARCHES):
+                p_xdotools = [Popen(["xdotool", 'search', '--pid', pid], stdout=PIPE, text=True) for pid in pids[batch_start:batch_start + XDOTOOL_CONCURRENT_SEARCHES]]
+                for p_xdotool in p_xdotools:
+                    str_window_ids, err = p_xdotool.communicate()
+                    window_ids_string_list.append(str_window_ids)
         else:  # Fallback to searching via xdotool
-            p_xdotool = Popen(["xdotool", 'search', '--name', application_name], stdout=PIPE)
+            p_xdotool = Popen(["xdotool", 'search', '--name', application_name], stdout=PIPE, text=True)
             str_window_ids, err = p_xdotool.communicate()
             window_ids_string_list.append(str_window_ids)
     else:
         raise WindowPositionException("ERROR: get_window_ids_of_application() no application name nor pid supplied. Please provide at least one.")
 
     # Now suck all the data out of those processes:
-    print("window_ids_string_list: {}".format(window_ids_string_list))
+    logger.debug("window_ids_string_list: {}".format(window_ids_string_list))
     actual_window_ids = []
     if window_ids_string_list:
         window_ids_string = "\n".join(window_ids_string_list)
@@ -324,7 +741,7 @@ def get_window_ids_of_application(application_name=None, process_id=None, filter
         list_of_window_ids = sorted(filter(bool, list_of_window_ids))  # Ensures the same id stays in the same place on the list
         actual_window_ids.extend(list_of_window_ids)
     if err:
-        print("ERROR: {}".format(err))
+        logger.error("{}".format(err))
     if filter_out_icons_and_masks and actual_window_ids:  # Remove any windows less than 201 x 201
         actual_window_ids = filter_to_large_enough_windows(window_ids=actual_window_ids)
         # Second pass: try the children of those windows if still empty
@@ -370,9 +787,79 @@ def get_first_window_id_of_interest(application_name=ACTIVE_WINDOW, exclude_ids=
         return None
 
 
+def _get_detailed_properties_of_window_xlib(window_id):
+    """
+    Get the detailed information about a window by asking the X server directly
+    :param window_id:
+    :return: {"id": ..., "title": ..., "x": ..., "y": ..., "w": ..., "h": ...} or {} if no such window
+    """
+    window_id = int(window_id)
+    disp = xlib_display.Display()
+    try:
+        root = disp.screen().root
+        win = disp.create_resource_object('window', window_id)
+        geometry = win.get_geometry()
+        # Convert the window's own origin into absolute root coordinates (what xwininfo
+        # reports as "Absolute upper-left X/Y"):
+        coords = root.translate_coords(win, 0, 0)
+        title_prop = win.get_full_property(disp.intern_atom('_NET_WM_NAME'), xlib_X.AnyPropertyType)
+        if title_prop and title_prop.value:
+            title = title_prop.value
+            if not isinstance(title, str):
+                title = title.decode("utf-8", "replace")
+        else:
+            title = win.get_wm_name() or ""
+        window_info = {
+            "id": hex(window_id),
+            "title": str(title),
+            'x': int(coords.x),
+            'y': int(coords.y),
+            'w': int(geometry.width),
+            'h': int(geometry.height),
+        }
+    finally:
+        disp.close()
+    logger.debug(window_info)
+    return window_info
+
+
+def _get_detailed_properties_of_window_xwininfo(window_id):
+    """
+    Get the detailed information about a window by parsing xwininfo output. Fallback for when
+    python-xlib is not installed.
+    :param window_id:
+    :return: {"id": ..., "title": ..., "x": ..., "y": ..., "w": ..., "h": ...} or {} if no such window
+    """
+    window_id = str(int(window_id))
+    p_xwininfo = Popen(["xwininfo", "-id", window_id], stdout=PIPE, text=True)
+    window_text, err = p_xwininfo.communicate()
+    logger.debug(window_text)
+    if err:
+        logger.debug(err)
+
+    window_info = {
+        'x': 0,
+        'y': 0,
+    }
+
+    # Extract useful information from current window (one scan of the output rather than five):
+    win_details = _re_win().search(window_text)
+    if not win_details:
+        logger.error("No active window found by id {id} in [get_detailed_properties_of_window({id})]".format(id=window_id))
+        return {}
+    window_info["id"] = win_details.group(1)
+    window_info["title"] = win_details.group(2)
+    window_info['x'] = int(win_details.group(3))
+    window_info['y'] = int(win_details.group(4))
+    window_info['w'] = int(win_details.group(5))
+    window_info['h'] = int(win_details.group(6))
+    return window_info
+
+
 def get_detailed_properties_of_window(window_id):
     """
-    Get the detailed information about a window
+    Get the detailed information about a window. Asks the X server directly where python-xlib
+    is available (no subprocess), otherwise shells out to xwininfo.
     :param window_id:
     :return: {
         "id": 42136835,
@@ -385,44 +872,39 @@ def get_detailed_properties_of_window(window_id):
         "centre_y": 679
     }
     """
-    window_id = str(int(window_id))
-    p_xwininfo = Popen(["xwininfo", "-id", window_id], stdout=PIPE)
-    window_text, err = p_xwininfo.communicate()
-    print(window_text)
-    if err:
-        print(err)
-
-    window_info = {
-        'x': 0,
-        'y': 0,
-    }
-
-    # Extract useful information from current window:
-    win_details = re_win_name.findall(window_text)
-    print(win_details)
-    try:
-        win_details = win_details[0]
-    except IndexError:
-        print("ERROR: No active window found by id {id} in [get_detailed_properties_of_window({id})]".format(id=window_id))
+    window_info = None
+    if xlib_display is not None:
+        try:
+            window_info = _get_detailed_properties_of_window_xlib(window_id)
+        except Exception as e:
+            logger.warning("Window query via python-xlib failed ({}). Falling back to xwininfo.".format(e))
+            window_info = None
+    if window_info is None:
+        window_info = _get_detailed_properties_of_window_xwininfo(window_id)
+    if not window_info:
         return {}
-    else:
-        window_info["id"] = win_details[0]
-        window_info["title"] = win_details[1]
-    win_x = re_win_x.findall(window_text)
-    window_info['x'] = int(win_x[0])
-    win_y = re_win_y.findall(window_text)
-    window_info['y'] = int(win_y[0])
-    win_w = re_win_w.findall(window_text)
-    window_info['w'] = int(win_w[0])
-    win_h = re_win_h.findall(window_text)
-    window_info['h'] = int(win_h[0])
-    midpoint_x = int(math.ceil(window_info['x'] + window_info['w']/2))
+    midpoint_x = window_info['x'] + (window_info['w'] + 1) // 2  # +1 keeps the old ceil() rounding
     window_info["centre_x"] = midpoint_x
-    midpoint_y = int(math.ceil(window_info['y'] + window_info['h']/2))
+    midpoint_y = window_info['y'] + (window_info['h'] + 1) // 2
     window_info["centre_y"] = midpoint_y
     return window_info
 
 
+def _get_screens_xywh_array(screens):
+    """
+    Memoised numpy matrix of the monitor rectangles, one [x, y, w, h] row per monitor.
+    Rebuilt only when the screens list itself is replaced (keyed on identity), so repeated
+    hit-tests amortise the dict-to-array conversion instead of paying it per call.
+    :param screens: the list returned by get_screens_and_positions()
+    :return: <numpy.ndarray>
+    """
+    global _screens_xywh_memo
+    if _screens_xywh_memo is None or _screens_xywh_memo[0] is not screens:
+        xywh_array = numpy.array([[m['x'], m['y'], m['w'], m['h']] for m in screens], dtype=numpy.int32)
+        _screens_xywh_memo = (screens, xywh_array)
+    return _screens_xywh_memo[1]
+
+
 def get_monitor_a_location_is_on(x, y):
     """
     Return the monitor which displays stuff at the given pixel location
@@ -438,6 +920,17 @@ def get_monitor_a_location_is_on(x, y):
     """
     desktop_split_by_screens = get_screens_and_positions()
 
+    if numpy is not None and len(desktop_split_by_screens) >= 4:
+        # On big rigs, do the containment test as one vectorised boolean reduction:
+        mon_xywh = _get_screens_xywh_array(desktop_split_by_screens)
+        hits = (
+            (mon_xywh[:, 0] <= x) & (x <= mon_xywh[:, 0] + mon_xywh[:, 2])
+            & (mon_xywh[:, 1] <= y) & (y <= mon_xywh[:, 1] + mon_xywh[:, 3])
+        )
+        if hits.any():
+            return desktop_split_by_screens[int(hits.argmax())]
+        return desktop_split_by_screens[0]  # Default to being positioned in first monitor
+
     resident_monitor = desktop_split_by_screens[0]  # Default to being positioned in first monitor
     for monitor in desktop_split_by_screens:
         if x >= monitor["x"] and x <= (monitor["x"] + monitor["w"]) and y >= monitor["y"] and y <= (monitor["y"] + monitor["h"]):
@@ -459,9 +952,9 @@ def get_monitor_by_name_or_id(name=None, monitor_id=None):
     }
     """
     if name is not None and monitor_id is not None:
-        print("WARNING: get_monitor_by_name_or_id() both a monitor name and an ID were supplied. Ignoring name ({}) and using id instead (#{}).".format(name, id))
+        logger.warning("get_monitor_by_name_or_id() both a monitor name and an ID were supplied. Ignoring name ({}) and using id instead (#{}).".format(name, id))
     elif name is None and monitor_id is None:
-        print("WARNING: get_monitor_by_name_or_id() no monitor name or ID were supplied. Defaulting to first screen.")
+        logger.warning("get_monitor_by_name_or_id() no monitor name or ID were supplied. Defaulting to first screen.")
     if name:
         name = str(name).strip()
     if monitor_id:
@@ -475,7 +968,7 @@ def get_monitor_by_name_or_id(name=None, monitor_id=None):
         try:
             return desktop_split_by_screens[monitor_id]
         except IndexError:
-            print("ERROR: Cannot find monitor by id #{}".format(monitor_id))
+            logger.error("Cannot find monitor by id #{}".format(monitor_id))
             return None
     if name:
         clean_target_monitor_name = name.lower()
@@ -488,19 +981,54 @@ def get_monitor_by_name_or_id(name=None, monitor_id=None):
     return resident_monitor
 
 
+def _wait_for_window_of_pid_xlib(pid, timeout=1.0):
+    """
+    Waits for a freshly spawned process to create a window, by listening for CreateNotify
+    events on the root window and matching _NET_WM_PID - we react the instant the window
+    appears instead of polling pgrep/xdotool on a 50ms tick.
+    :param pid: <int> the process id we expect to own the new window
+    :param timeout: <float> seconds to wait before giving up
+    :return: <int> window id, or None if nothing appeared in time
+    """
+    disp = xlib_display.Display()
+    selector = selectors.DefaultSelector()
+    try:
+        root = disp.screen().root
+        root.change_attributes(event_mask=xlib_X.SubstructureNotifyMask)
+        disp.flush()
+        atom_net_wm_pid = disp.intern_atom('_NET_WM_PID')
+        selector.register(disp.fileno(), selectors.EVENT_READ)
+        deadline = monotonic() + timeout
+        while True:
+            remaining = deadline - monotonic()
+            if remaining <= 0:
+                return None
+            if not selector.select(remaining):
+                continue  # Spurious wakeup; the deadline check above will end us
+            while disp.pending_events():
+                event = disp.next_event()
+                if event.type != xlib_X.CreateNotify:
+                    continue
+                try:
+                    prop = event.window.get_full_property(atom_net_wm_pid, xlib_X.AnyPropertyType)
+                except Exception:
+                    continue  # Window vanished again before we could inspect it
+                if prop and prop.value and int(prop.value[0]) == int(pid):
+                    return int(event.window.id)
+    finally:
+        selector.close()
+        disp.close()
+
+
 def _spawn_missing_application(application_name, *additional_args, **additional_kwargs):
     """
     Spawns the desired application. Returns its pid and window id
     :param application_name:
     :return: (pid, window_id)
     """
-    try:
-        try:
-            base_command = launcher_commmands[application_name.lower()]
-        except KeyError:
-            base_command = launcher_commmands[application_name]
-    except KeyError:
-        raise Exception("ERROR: Application by name '{}' does not have a launcher command. Cannot launch an instance.".format(application_name))
+    base_command = _launcher_commmands_ci.get(str(application_name).lower())
+    if base_command is None:
+        raise WindowPositionException("ERROR: Application by name '{}' does not have a launcher command. Cannot launch an instance.".format(application_name))
 
     safer_command = base_command.split()  # split by space
 
@@ -521,36 +1049,98 @@ def _spawn_missing_application(application_name, *additional_args, **additional_
                 built_kwarg = "{}={}".format(k, v.strip())
                 safer_command.append(built_kwarg)
 
-    python_version = sys.version_info
-    if python_version >= (3, 8):
-        import detach
-        spawned_process = detach.call(safer_command)  # Python 3.8+
-    elif python_version >= (3, 2):
+    if _detached_call is not None and sys.version_info >= (3, 8):
+        spawned_process = _detached_call(safer_command)  # Python 3.8+
+    elif sys.version_info >= (3, 2):
         spawned_process = subprocess.Popen(safer_command, start_new_session=True)  # Python 2.2-3.8
     else:
         spawned_process = subprocess.Popen(safer_command)  # Python 2.2-3.8
 
-    # Wait until we have a window
+    # Wait until we have a window. Prefer blocking on CreateNotify X events (instant reaction,
+    # no subprocess storms); fall back to polling if python-xlib is missing or the app never
+    # advertises its pid.
     found_window_id = None
-    spawned_process_id = None
-    for tries in range(0, 20):
-        spawned_process_id = spawned_process.pid
-        windows_from_process = get_window_ids_of_application(process_id=spawned_process_id, filter_out_icons_and_masks=True)
-        if windows_from_process:
-            found_window_id = windows_from_process[-1]
-            break
-        sleep(0.05)
+    spawned_process_id = spawned_process.pid
+    if xlib_display is not None:
+        try:
+            found_window_id = _wait_for_window_of_pid_xlib(spawned_process_id)
+        except Exception as e:
+            logger.warning("Event-driven spawn wait failed ({}). Falling back to polling.".format(e))
+    if found_window_id is None:
+        for tries in range(0, 20):
+            windows_from_process = get_window_ids_of_application(process_id=spawned_process_id, filter_out_icons_and_masks=True)
+            if windows_from_process:
+                found_window_id = windows_from_process[-1]
+                break
+            sleep(0.05)
 
     if found_window_id is None:
         found_window_id = get_first_window_id_of_interest(application_name=application_name)
-    print("proc:{}, wind={}".format(spawned_process_id, found_window_id))
+    logger.debug("proc:{}, wind={}".format(spawned_process_id, found_window_id))
 
     return spawned_process.pid, found_window_id
 
 
+def _send_client_message(disp, root, win, atom_name, data):
+    """
+    Sends an EWMH ClientMessage to the root window (how pagers/scripts ask the window manager
+    to do things). Mirrors what wmctrl does internally.
+    :param disp: open Xlib display
+    :param root: the root window
+    :param win: the window the message is about
+    :param atom_name: <str> name of the message atom e.g. '_NET_WM_STATE'
+    :param data: list of up to 5 ints of message data
+    :return:
+    """
+    event = xlib_protocol.event.ClientMessage(
+        window=win,
+        client_type=disp.intern_atom(atom_name),
+        data=(32, (list(data) + [0, 0, 0, 0, 0])[:5])
+    )
+    event_mask = xlib_X.SubstructureRedirectMask | xlib_X.SubstructureNotifyMask
+    root.send_event(event, event_mask=event_mask)
+
+
+def _resize_and_move_window_to_position_xlib(window_id, x, y, w, h):
+    """
+    Resizes the window and moves it to the desired position via EWMH ClientMessages on an Xlib
+    connection - a handful of X requests over one socket instead of three subprocesses.
+    :param window_id: <int> window_id
+    :param x: position of top left x
+    :param y: position of top left y
+    :param w: window width
+    :param h: window height
+    :return:
+    """
+    window_id = int(window_id)
+    disp = xlib_display.Display()
+    try:
+        root = disp.screen().root
+        win = disp.create_resource_object('window', window_id)
+        # Remove any locks on window position (wmctrl -b remove,maximized_vert,maximized_horz):
+        _send_client_message(disp, root, win, '_NET_WM_STATE', [
+            0,  # _NET_WM_STATE_REMOVE
+            disp.intern_atom('_NET_WM_STATE_MAXIMIZED_VERT'),
+            disp.intern_atom('_NET_WM_STATE_MAXIMIZED_HORZ'),
+            1,  # Source indication: normal application
+        ])
+        # Resize and move window (wmctrl -e 0,x,y,w,h). Low byte is the gravity, bits 8-11 flag
+        # that x, y, w and h are all present:
+        gravity_and_flags = xlib_X.StaticGravity | (0x0F << 8)
+        _send_client_message(disp, root, win, '_NET_MOVERESIZE_WINDOW', [gravity_and_flags, int(x), int(y), int(w), int(h)])
+        # Raise and focus the window (xdotool windowactivate):
+        _send_client_message(disp, root, win, '_NET_ACTIVE_WINDOW', [2, xlib_X.CurrentTime, 0])
+        disp.flush()
+    finally:
+        disp.close()
+    logger.debug("New window position for #%s: %sx%s %s,%s" % (str(window_id), str(w), str(h), str(x), str(y)))
+    return 0
+
+
 def _resize_and_move_window_to_position(window_id, x, y, w, h):
     """
-    Resizes the window and moves it to the desired position
+    Resizes the window and moves it to the desired position. Sends the requests directly over
+    Xlib where python-xlib is available, otherwise shells out to wmctrl/xdotool.
     :param window_id: <int> window_id
     :param x: position of top left x
     :param y: position of top left y
@@ -558,35 +1148,65 @@ def _resize_and_move_window_to_position(window_id, x, y, w, h):
     :param h: window height
     :return:
     """
+    if xlib_display is not None:
+        try:
+            return _resize_and_move_window_to_position_xlib(window_id, x, y, w, h)
+        except Exception as e:
+            logger.warning("Move via python-xlib failed ({}). Falling back to wmctrl.".format(e))
     window_id = int(window_id)
-    # Remove any locks on window position
-    window_manipulation_command = "wmctrl -i -r {window_id} -b remove,maximized_vert,maximized_horz -v".format(window_id=str(window_id))
-    exit_code_1 = subprocess.check_call(window_manipulation_command.split())
-    # Resize window
-    window_manipulation_command2 = "wmctrl -i -r {window_id} -e 0,{x},{y},{w},{h} -v".format(
+    # Unlock the window position, resize/move it, then activate it - chained through one shell
+    # so we pay for a single fork from Python rather than three fork/wait cycles. Everything
+    # interpolated is an int, so there's nothing for the shell to mangle.
+    window_manipulation_command = (
+        "wmctrl -i -r {window_id} -b remove,maximized_vert,maximized_horz && "
+        "wmctrl -i -r {window_id} -e 0,{x},{y},{w},{h} && "
+        "xdotool windowactivate {window_id}"
+    ).format(
         window_id=str(window_id),
-        x=str(x),
-        y=str(y),
-        w=str(w),
-        h=str(h)
+        x=str(int(x)),
+        y=str(int(y)),
+        w=str(int(w)),
+        h=str(int(h))
     )
-    exit_code_2 = subprocess.check_call(window_manipulation_command2.split())
-    # Maximise window
-    window_manipulation_command3 = "xdotool windowactivate {window_id}".format(window_id=str(window_id))
-    exit_code_3 = subprocess.check_call(window_manipulation_command3.split())
-    print("New window position for #%s: %sx%s %s,%s" % (str(window_id), str(w), str(h), str(x), str(y)))
-    return exit_code_1 + exit_code_2 + exit_code_3
+    exit_code = subprocess.check_call(window_manipulation_command, shell=True)
+    logger.debug("New window position for #%s: %sx%s %s,%s" % (str(window_id), str(w), str(h), str(x), str(y)))
+    return exit_code
+
+
+def _move_window_to_desktop_xlib(window_id, desktop_id):
+    """
+    Moves the window to the desired desktop by sending the _NET_WM_DESKTOP ClientMessage
+    directly (the exact message wmctrl -t generates), on an Xlib connection.
+    :param window_id: <int> window_id
+    :param desktop_id: <int> The desktop id
+    :return:
+    """
+    disp = xlib_display.Display()
+    try:
+        root = disp.screen().root
+        win = disp.create_resource_object('window', int(window_id))
+        _send_client_message(disp, root, win, '_NET_WM_DESKTOP', [int(desktop_id), 1])  # 1 = normal application source
+        disp.flush()
+    finally:
+        disp.close()
+    return 0
 
 
 def _move_window_to_desktop(window_id, desktop_id=None):
     """
-    Moves the window to the desired desktop
+    Moves the window to the desired desktop. Sends the request directly over Xlib where
+    python-xlib is available, otherwise shells out to wmctrl.
     :param window_id: <int> window_id
     :param desktop_id: <int> The desktop id
     :return:
     """
     if desktop_id is None:
         return 0
+    if xlib_display is not None:
+        try:
+            return _move_window_to_desktop_xlib(window_id, desktop_id)
+        except Exception as e:
+            logger.warning("Desktop move via python-xlib failed ({}). Falling back to wmctrl.".format(e))
     exit_code = os.system(
         "wmctrl -i -r {window_id} -t {desktop_id}".format(
             window_id=str(int(window_id)),
@@ -614,7 +1234,7 @@ def reposition_window(application_name=None, nth_instance_of_application=0, wind
     if not application_name and not window_id:
         application_name = ACTIVE_WINDOW
     elif application_name and window_id:
-        print("WARNING: you supplied BOTH a window ID and an application name. The application name will be ignored.")
+        logger.warning("you supplied BOTH a window ID and an application name. The application name will be ignored.")
 
     if window_id is not None:
         window_id = int(window_id)
@@ -623,7 +1243,7 @@ def reposition_window(application_name=None, nth_instance_of_application=0, wind
     if application_name and not window_id:
         window_ids = get_window_ids_of_interest(application_name=application_name)
         if application_name == ACTIVE_WINDOW and not window_ids:
-            print("ERROR: No active window.")
+            logger.error("No active window.")
             return 1
         nth_instance_of_application = int(nth_instance_of_application or 0)
         try:
@@ -634,30 +1254,37 @@ def reposition_window(application_name=None, nth_instance_of_application=0, wind
                 try:
                     _pid, window_id = _spawn_missing_application(application_name)
                 except WindowPositionException as e:
-                    print(e)
+                    logger.debug(e)
                     return 1
             else:
-                print("ERROR: No windows loaded for applications by name '{}'".format(application_name))
+                logger.error("No windows loaded for applications by name '{}'".format(application_name))
                 return 1
 
-    # Determine which position our active window is in:
-    window_of_interest = get_detailed_properties_of_window(window_id)
-    if not window_of_interest:
-        print("ERROR: No window by id #{}".format(window_id))
-        return 1
-    midpoint_x = window_of_interest["centre_x"]
-    midpoint_y = window_of_interest["centre_y"]
-
-    # Determine which monitor our window mostly resides in:
+    # Determine which monitor our window should end up on. If the caller already named both
+    # the target monitor and the application (as every layout entry does), the window's
+    # current position is irrelevant and the application name covers the chromium margin
+    # check, so we can skip fetching the window's properties entirely - the biggest remaining
+    # lookup on the layout hot path. For the active window (or a bare window id) the title is
+    # unknown and the margin special case can't be ruled out, so fetch it regardless:
+    window_of_interest = None
+    if not target_monitor_name or not application_name or application_name == ACTIVE_WINDOW:
+        window_of_interest = get_detailed_properties_of_window(window_id)
+        if not window_of_interest:
+            logger.error("No window by id #{}".format(window_id))
+            return 1
     if target_monitor_name:  # If you've specified a target monitor name, go fetch that
         target_monitor = get_monitor_by_name_or_id(name=target_monitor_name)
     else:
+        midpoint_x = window_of_interest["centre_x"]
+        midpoint_y = window_of_interest["centre_y"]
         target_monitor = get_monitor_a_location_is_on(x=midpoint_x, y=midpoint_y)
 
+    window_description = (window_of_interest or {}).get("title") or application_name or window_id
+
     # Resolve desired position
-    if not target_position and not target_desktop_id:
-        print("ERROR: No target position defined for window ({}). Please provide one or two of: 'top'/'bottom' 'left'/'right'.".format(window_of_interest["title"] or window_id))
-        print("ERROR: No desktop_id provided for window ({}).".format(window_of_interest["title"] or window_id))
+    if not target_position and target_desktop_id is None:  # Desktop 0 is a valid target
+        logger.error("No target position defined for window ({}). Please provide one or two of: 'top'/'bottom' 'left'/'right'.".format(window_description))
+        logger.error("No desktop_id provided for window ({}).".format(window_description))
         return 1
 
     if target_position:
@@ -665,37 +1292,30 @@ def reposition_window(application_name=None, nth_instance_of_application=0, wind
             target_position = tuple([target_position])
 
         # Now look at the arguments to see where we wish to position this window!
-        lower_win_title = window_of_interest['title'].lower()
-        target_monitor_margins = SCREEN_MARGINS.get(str(target_monitor["name"]), (0, 0, 0, 0)) #Default to no margins if cannot find the screen
+        # Build a set once so each keyword test is a single O(1) membership check:
+        position_flags = frozenset(str(position).lower() for position in target_position)
+        has_horizontal = not position_flags.isdisjoint(HORIZONTAL_FLAGS)
+        has_vertical = not position_flags.isdisjoint(VERTICAL_FLAGS)
+
+        # When we skipped the window property fetch, the application name stands in for the
+        # title - it's only needed to spot chrome/chromium for the margin special case:
+        if window_of_interest is not None:
+            lower_win_title = window_of_interest['title'].lower()
+        else:
+            lower_win_title = str(application_name or "").lower()
+        # Margins were resolved once when the monitors were enumerated; fall back to a live
+        # lookup for entries from an older on-disk cache that predates the precomputation:
+        target_monitor_margins = target_monitor.get("margins") or SCREEN_MARGINS.get(str(target_monitor["name"]), (0, 0, 0, 0))
 
         if "google chrome" in lower_win_title or "chromium" in lower_win_title:
             # Apply a special correction for chrome only on certain screens:
-            if ("left" in target_position or "right" in target_position) and not ("top" in target_position or "bottom" in target_position):
+            if has_horizontal and not has_vertical:
                 target_monitor_margins = CHROMIUM_MARGINS.get(str(target_monitor["name"]), (32, 0, 0, 0)) #Default to no margins if cannot find the screen
 
-        # WIDTH + HEIGHT: Set default target width and height
-        target_width = (target_monitor["w"]/1 - target_monitor_margins[1] - target_monitor_margins[3])
-        target_height = (target_monitor["h"]/1 - target_monitor_margins[0] - target_monitor_margins[2])
-
-        #If a horizontal keyword appears in the arguments, the target width is halved:
-        if "left" in target_position or "right" in target_position:
-            target_width = (target_monitor["w"]/2 - target_monitor_margins[1] - target_monitor_margins[3])
-        #If a vertical keyword appears in the arguments, the target height is
-        if "top" in target_position or "bottom" in target_position:
-            target_height = (target_monitor["h"]/2 - target_monitor_margins[0] - target_monitor_margins[2])
-
-        # POSITION - Default to top left
-        target_xoff = (target_monitor['x'] + target_monitor_margins[3])
-        target_yoff = (target_monitor['y'] + target_monitor_margins[0])
-
-        if str("right") in target_position: #If 'right' appears in the arguments, offset to right of monitor:
-            target_xoff = target_monitor['x'] + target_monitor['w'] - target_width - target_monitor_margins[1]
-        if str("left") in target_position: #If 'left' appears in the arguments, offset to left of monitor:
-            target_xoff = target_monitor['x'] + target_monitor_margins[3]
-        if str("bottom") in target_position: #If 'bottom' appears in the arguments, offset to bottom of monitor:
-            target_yoff = target_monitor['y'] + target_monitor['h'] - target_height - target_monitor_margins[2]
-        if str("top") in target_position: #If 'left' appears in the arguments, offset to left of monitor:
-            target_yoff = target_monitor['y'] + target_monitor_margins[0]
+        # WIDTH + HEIGHT + POSITION: one table lookup on the recognised keywords gives us the
+        # whole target rectangle:
+        position_calculator = POSITIONS.get(position_flags & POSITION_FLAGS) or POSITIONS[frozenset()]
+        target_xoff, target_yoff, target_width, target_height = position_calculator(target_monitor, target_monitor_margins)
 
         _resize_and_move_window_to_position(window_id, target_xoff, target_yoff, target_width, target_height)
 
@@ -727,6 +1347,30 @@ def reposition_window_and_spawn_missing(application_name=None, nth_instance_of_a
     )
 
 
+@functools.lru_cache(maxsize=32)
+def _resolve_layout_strategies(layout_name, override_items):
+    """
+    Merges a layout's strategies with an override profile, memoised on both. A layout bound
+    to a hotkey is run with the same overrides again and again, so after the first call the
+    fully merged kwargs come straight out of the cache with no dict building at all.
+    :param layout_name: <str> normalised (stripped, lowercased) layout name
+    :param override_items: <tuple> sorted (key, value) pairs of the overrides; values must be hashable
+    :return: <tuple> one merged kwargs dict per strategy in the layout
+    """
+    overrides = dict(override_items)
+    override_keys = overrides.keys()
+    resolved = []
+    for layout_strategy in _layouts_ci[layout_name]:
+        # Strategies are read-only mappings, so a single dict merge folds the overrides in
+        # with no defensive copying needed. When the overrides already cover every key the
+        # strategy would contribute, skip the merge altogether:
+        if layout_strategy.keys() <= override_keys:
+            resolved.append(overrides)
+        else:
+            resolved.append({**layout_strategy, **overrides})
+    return tuple(resolved)
+
+
 def run_layout(layout, override_kwargs=()):
     """
     Run the specified layout
@@ -734,73 +1378,78 @@ def run_layout(layout, override_kwargs=()):
     :param override_kwargs:
     :return:
     """
-    try:
-        layout_list = layouts[str(layout).strip()]
-    except KeyError:
-        try:
-            layout_list = layouts[str(layout).lower().strip()]
-        except KeyError:
-            raise WindowPositionException("No such layout by name '{}'".format(layout))
-
-    # Now work out override. Bin any default values:
-    final_override_kwargs = {}
-    for k, v in override_kwargs.items():
-        if v not in (None, False, "", [], ()):  # We DO allow zeros
-            final_override_kwargs[k] = v
-
-    # Build our finals
-    strategy_kwargs = {}
-    strategy_kwargs.update(final_override_kwargs)  # Now we get our lovely overrides in there
-
-    # Now parse that layout!
-    successes = []
-    failures = []
-    for layout_strategy in layout_list:
-        this_strategy_kwargs = copy.deepcopy(layout_strategy)  # Take the dict from the layout strategy without polluting it
-        this_strategy_kwargs.update(final_override_kwargs)
-        print("{} ---> \n{}".format(layout_strategy, this_strategy_kwargs))
-        error_code = reposition_window(**this_strategy_kwargs)
-        if error_code:
-            failures.append(layout_strategy)
-        else:
-            successes.append(layout_strategy)
+    layout_name = str(layout).strip().lower()
+    layout_list = _layouts_ci.get(layout_name)
+    if layout_list is None:
+        raise WindowPositionException("No such layout by name '{}'".format(layout))
+
+    # Now work out override. Bin any default values (we DO allow zeros; target_position
+    # arrives as a possibly-empty list, everything else as strings, ints, None or False).
+    # Lists become tuples so the override profile is hashable for the merge cache:
+    final_override_kwargs = {k: (tuple(v) if isinstance(v, list) else v) for k, v in override_kwargs.items() if v is not None and v is not False and v != "" and v != [] and v != ()}
+    resolved_strategy_kwargs = _resolve_layout_strategies(layout_name, tuple(sorted(final_override_kwargs.items())))
+
+    # Prime the monitor cache once up front so the workers don't all race to enumerate screens:
+    get_screens_and_positions()
+
+    def apply_strategy(strategy_and_kwargs):
+        """Applies one strategy from the layout. Returns (strategy, error_code)"""
+        layout_strategy, this_strategy_kwargs = strategy_and_kwargs
+        logger.debug("%s ---> \n%s", layout_strategy, this_strategy_kwargs)
+        return layout_strategy, reposition_window(**this_strategy_kwargs)
+
+    # Now parse that layout! Each window's repositioning is I/O-bound waiting on X (or on
+    # subprocesses), with no shared mutable state, so run the strategies in parallel:
+    n_successes = 0
+    n_failures = 0
+    with ThreadPoolExecutor(max_workers=min(len(layout_list), 8) or 1) as executor:
+        for layout_strategy, error_code in executor.map(apply_strategy, zip(layout_list, resolved_strategy_kwargs)):
+            if error_code:
+                n_failures += 1
+                logger.debug("Failed: %s", layout_strategy)
+            else:
+                n_successes += 1
 
-    print("Successes: {}".format(successes))
-    print("Failures: {}".format(failures))
-    return len(failures)
+    # One write for the whole summary rather than a print (and flush) per line:
+    print("Successes: {}\nFailures: {}".format(n_successes, n_failures))
+    return n_failures
 
 
-# Run when directly called
-if __name__ == "__main__":
-    usage = [
+@functools.lru_cache(maxsize=1)
+def _get_usage_text():
+    """
+    The usage text is a pure function of __file__, so format it once and reuse it.
+    :return: <str> the full usage/help text
+    """
+    usage_template = "\n".join([
         "Windowpos: Sane way to move your windows around from the command line.",
         "",
         "  Moving currently active window, specify top/bottom and/or left/right or middle:",
-        "\tpython ./{} top".format(__file__),
-        "\tpython ./{} top left".format(__file__),
-        "\tpython ./{} top right".format(__file__),
-        "\tpython ./{} bottom".format(__file__),
-        "\tpython ./{} bottom left".format(__file__),
-        "\tpython ./{} bottom right".format(__file__),
-        "\tpython ./{} left".format(__file__),
-        "\tpython ./{} right".format(__file__),
-        "\tpython ./{} middle".format(__file__),
+        "\tpython ./{f} top",
+        "\tpython ./{f} top left",
+        "\tpython ./{f} top right",
+        "\tpython ./{f} bottom",
+        "\tpython ./{f} bottom left",
+        "\tpython ./{f} bottom right",
+        "\tpython ./{f} left",
+        "\tpython ./{f} right",
+        "\tpython ./{f} middle",
         "",
         "  Moving specific application's first window, specify -n or --name:",
-        "\tpython ./{} -n=brave top left".format(__file__),
-        "\tpython ./{} --name=brave top left".format(__file__),
+        "\tpython ./{f} -n=brave top left",
+        "\tpython ./{f} --name=brave top left",
         "",
         "  Moving specific application's additional window, specify -n or --name and -i or --instance.",
-        "\tpython ./{} -n=brave -i=2 top left".format(__file__),
-        "\tpython ./{} --name=brave --instance=2 top left".format(__file__),
+        "\tpython ./{f} -n=brave -i=2 top left",
+        "\tpython ./{f} --name=brave --instance=2 top left",
         ""
         "  Moving currently active window to a different monitor, specify -m or --monitor. If omitted will use the monitor the window is currently on.",
-        "\tpython ./{} -m=DP-2 top".format(__file__),
-        "\tpython ./{} --monitor=DP-2 top left".format(__file__),
+        "\tpython ./{f} -m=DP-2 top",
+        "\tpython ./{f} --monitor=DP-2 top left",
         "",
         "  Moving currently active window to a different desktop, specify -d or --desktop. If omitted will use the desktop the window is currently on.",
-        "\tpython ./{} -d=1 top".format(__file__),
-        "\tpython ./{} --desktop=1 top left".format(__file__),
+        "\tpython ./{f} -d=1 top",
+        "\tpython ./{f} --desktop=1 top left",
         "",
         "",
         "Options:",
@@ -809,19 +1458,292 @@ if __name__ == "__main__":
         "\t-m, --monitor     which monitor to move the window to",
         "\t-d, --desktop     which desktop to move the window to (when using multiple desktops)",
         "\t-s, --layout      run the specified layout. Other options supplied will override the layout strategy.",
+        "\t-v, --verbose     print debugging output as windows are moved.",
+        "\t-D, --daemon      run as a daemon, accepting commands over a unix socket to dodge interpreter startup cost.",
         ""
-    ]
-    ap = argparse.ArgumentParser(usage="\n".join(usage))
+    ])
+    return usage_template.format(f=__file__)
+
+
+def build_argument_parser():
+    """
+    Builds the command line argument parser. Shared by direct invocation and the daemon's
+    request handler so both speak exactly the same dialect.
+    :return: <argparse.ArgumentParser>
+    """
+    import argparse  # Deferred: library callers importing this module never pay for it
+    ap = argparse.ArgumentParser(usage=_get_usage_text())
     ap.add_argument("-n", "--name", dest="application_name", default=None, required=False, help="The application name you wish to move the window of.")
-    ap.add_argument("-i", "--instance", dest="nth_instance_of_application", default=None, required=False, help="Where an application has more than one window, which of the windows you wish to move.")
+    ap.add_argument("-i", "--instance", dest="nth_instance_of_application", type=int, default=None, required=False, help="Where an application has more than one window, which of the windows you wish to move.")
     ap.add_argument("-m", "--monitor", dest="target_monitor_name", default="", required=False, help="Which monitor screen you want to put the window on.")
-    ap.add_argument("-d", "--desktop", dest="target_desktop_id", required=False, help="Which desktop (when using multiple desktops) you wish to put the window on.")
+    ap.add_argument("-d", "--desktop", dest="target_desktop_id", type=int, required=False, help="Which desktop (when using multiple desktops) you wish to put the window on.")
     ap.add_argument("-s", "--spawn", dest="spawn_missing", default=False, required=False, help="Should absent windows be spawned?")
     ap.add_argument("-l", "--layout", dest="layout", default="", required=False, help="Which preconfigured layout you wish to achieve.")
+    ap.add_argument("-v", "--verbose", dest="verbose", action="store_true", default=False, required=False, help="Print debugging output as windows are moved.")
+    ap.add_argument("-D", "--daemon", dest="daemon", action="store_true", default=False, required=False, help="Run as a long-lived daemon listening on a unix socket.")
     ap.add_argument(dest="target_position", nargs=argparse.REMAINDER)
-    args = vars(ap.parse_args())
-    layout_name = args.pop("layout")
+    return ap
+
+
+# The CLI is tiny, so the common path is parsed by hand: argparse's parser construction
+# alone costs several milliseconds per invocation, which matters on a keybinding.
+_CLI_VALUE_OPTIONS = {
+    "-n": "application_name", "--name": "application_name",
+    "-i": "nth_instance_of_application", "--instance": "nth_instance_of_application",
+    "-m": "target_monitor_name", "--monitor": "target_monitor_name",
+    "-d": "target_desktop_id", "--desktop": "target_desktop_id",
+    "-s": "spawn_missing", "--spawn": "spawn_missing",
+    "-l": "layout", "--layout": "layout",
+}
+_CLI_FLAG_OPTIONS = {
+    "-v": "verbose", "--verbose": "verbose",
+    "-D": "daemon", "--daemon": "daemon",
+}
+# Options whose values are normalised to int once at parse time, so downstream callers
+# (including every strategy of a layout run) never re-coerce them:
+_CLI_INT_DESTINATIONS = frozenset(("nth_instance_of_application", "target_desktop_id"))
+# The arguments reposition_window/run_layout actually take, in one fixed tuple so dispatch
+# can pull them out of either parser's result without copying and pruning a whole dict:
+_CLI_REPOSITION_KEYS = ("application_name", "nth_instance_of_application", "target_monitor_name", "target_desktop_id", "spawn_missing", "target_position")
+
+
+def parse_command_arguments(argv):
+    """
+    Hand-rolled fast parse of the command line. Handles -x=Y, --x=Y, -x Y and bare
+    positional position keywords.
+    :param argv: list of command line arguments (without the program name)
+    :return: <dict> of parsed arguments, or None if an unrecognised flag was seen
+             (the caller then falls back to argparse for proper usage/error output)
+    """
+    args = {
+        "application_name": None,
+        "nth_instance_of_application": None,
+        "target_monitor_name": "",
+        "target_desktop_id": None,
+        "spawn_missing": False,
+        "layout": "",
+        "verbose": False,
+        "daemon": False,
+    }
+    target_position = []
+    index = 0
+    n_argv = len(argv)
+    while index < n_argv:
+        arg = argv[index]
+        index += 1
+        if not arg.startswith("-"):
+            target_position.append(arg)
+            continue
+        option, separator, value = arg.partition("=")
+        if option in _CLI_FLAG_OPTIONS:
+            args[_CLI_FLAG_OPTIONS[option]] = True
+            continue
+        destination = _CLI_VALUE_OPTIONS.get(option)
+        if destination is None:
+            return None  # Unknown flag (or --help): hand over to argparse
+        if not separator:
+            if index >= n_argv:
+                return None  # Value option with no value: let argparse report it
+            value = argv[index]
+            index += 1
+        if destination in _CLI_INT_DESTINATIONS:
+            try:
+                value = int(value)
+            except ValueError:
+                return None  # Not a number: let argparse report it
+        args[destination] = value
+    args["target_position"] = target_position
+    return args
+
+
+def dispatch_command(argv):
+    """
+    Parses an argv-style command and carries out the reposition or layout it describes
+    :param argv: list of command line arguments (without the program name)
+    :return: exit code
+    """
+    args = parse_command_arguments(argv)
+    if args is None:
+        # Rare path (--help, typos): argparse produces the proper usage and error text.
+        # Unpack the Namespace against the fixed key tuple rather than copying its
+        # __dict__ with vars() and popping the extras back out:
+        ap = build_argument_parser()
+        parsed_namespace = ap.parse_args(argv)
+        verbose = parsed_namespace.verbose
+        layout_name = parsed_namespace.layout
+        reposition_kwargs = {key: getattr(parsed_namespace, key) for key in _CLI_REPOSITION_KEYS}
+    else:
+        verbose = args["verbose"]
+        layout_name = args["layout"]
+        reposition_kwargs = {key: args[key] for key in _CLI_REPOSITION_KEYS}
+    if verbose:
+        logging.getLogger().setLevel(logging.DEBUG)
+    # Daemon mode is decided before we get here, so the daemon flag is simply ignored
     if not layout_name:
-        reposition_window(**args)
+        return reposition_window(**reposition_kwargs)
+    return run_layout(layout=layout_name, override_kwargs=reposition_kwargs)
+
+
+def _get_daemon_socket_path():
+    """
+    Where the daemon listens for commands
+    :return: <str> path to the unix socket
+    """
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return os.path.join(runtime_dir, DAEMON_SOCKET_FILENAME)
+    # No private runtime dir: suffix the uid so two users' daemons don't fight over one
+    # predictable /tmp name:
+    return os.path.join(tempfile.gettempdir(), "{}.{}".format(DAEMON_SOCKET_FILENAME, os.getuid()))
+
+
+def send_command_to_daemon(argv):
+    """
+    Try to hand the command to a running daemon, which has already paid the interpreter and
+    X-connection startup cost.
+    :param argv: list of command line arguments (without the program name)
+    :return: <bool> True if a daemon accepted the command, False if there's no daemon to talk to
+    """
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(_get_daemon_socket_path())
+        # NUL-delimit the fields so arguments containing spaces (-n "Google Chrome")
+        # survive the trip intact; the trailing newline terminates the command:
+        client.sendall(("\0".join(argv) + "\n").encode("utf-8"))
+    except (socket.error, OSError):
+        return False
+    finally:
+        client.close()
+    return True
+
+
+def _daemon_open_display_for_randr_events():
+    """
+    Opens a persistent display connection for the daemon and subscribes to RandR change events,
+    so we hear about monitor hotplugs instead of having to re-enumerate monitors per command.
+    :return: open Xlib display, or None if python-xlib is unavailable or the subscription failed
+    """
+    if xlib_display is None:
+        return None
+    try:
+        disp = xlib_display.Display()
+        root = disp.screen().root
+        xlib_randr.select_input(
+            root,
+            xlib_randr.RRScreenChangeNotifyMask
+            | xlib_randr.RRCrtcChangeNotifyMask
+            | xlib_randr.RROutputChangeNotifyMask
+        )
+        disp.flush()
+        return disp
+    except Exception as e:
+        logger.warning("Could not subscribe to RandR change events ({}). Monitor layout will be re-read per command.".format(e))
+        return None
+
+
+def _daemon_drain_x_events(disp):
+    """
+    Drains any queued X events on the daemon's display. We only subscribed to RandR change
+    masks, so anything pending means the monitor topology moved under us - drop the memo and
+    it'll be rebuilt lazily on the next command.
+    :param disp: the daemon's open Xlib display
+    :return:
+    """
+    stale = False
+    while disp.pending_events():
+        disp.next_event()
+        stale = True
+    if stale:
+        logger.debug("RandR change event received. Invalidating cached monitor layout.")
+        invalidate_screens_cache()
+
+
+def run_daemon():
+    """
+    Runs windowpos as a long-lived daemon: bind the unix socket, then loop handling one
+    newline-terminated command per connection. Keybindings then only pay for a socket
+    round-trip instead of a whole interpreter launch.
+    :return:
+    """
+    socket_path = _get_daemon_socket_path()
+    try:
+        os.unlink(socket_path)  # Clear out any stale socket from a dead daemon
+    except OSError:
+        pass
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    server.listen(5)
+    daemon_display = _daemon_open_display_for_randr_events()
+    logger.warning("windowpos daemon listening on {}".format(socket_path))
+
+    debounce = {"argv": None, "ts": 0.0}  # Last handled command, for coalescing autorepeat
+
+    def handle_client_connection():
+        """Accepts one client connection and carries out its command"""
+        connection, _address = server.accept()
+        try:
+            data = connection.recv(4096)
+        finally:
+            connection.close()
+        if not data:
+            return
+        # Decode the NUL-delimited framing from send_command_to_daemon - splitting on
+        # whitespace would corrupt any argument that contains a space:
+        payload = data.decode("utf-8", "replace").rstrip("\n")
+        argv = payload.split("\0") if payload else []
+        # A held keybind fires at the keyboard repeat rate and would race identical moves
+        # through the X server, causing flicker. Drop exact repeats inside the debounce window:
+        now = monotonic()
+        if argv == debounce["argv"] and (now - debounce["ts"]) < DAEMON_DEBOUNCE_SECONDS:
+            logger.debug("Debounced repeat command: {}".format(argv))
+            return
+        debounce["argv"] = argv
+        debounce["ts"] = now
+        logger.debug("Daemon received command: {}".format(argv))
+        try:
+            dispatch_command(argv)
+        except SystemExit:
+            pass  # argparse bails out on bad input. The daemon carries on regardless.
+        except WindowPositionException as e:
+            logger.error(e)
+        except Exception as e:
+            # A failed move (a tool exiting non-zero, a missing binary, no active window...)
+            # must never take the daemon down with it - the whole point of the daemon is that
+            # the NEXT keybind press is fast, so log it and keep serving:
+            logger.error("Command {} failed: {}".format(argv, e))
+
+    def handle_x_events():
+        """Drains RandR change events off the X socket"""
+        _daemon_drain_x_events(daemon_display)
+
+    # Multiplex the unix socket and the X socket: one readiness wait (epoll on Linux) covers
+    # both, so the idle daemon burns no CPU and reacts to whichever source fires first.
+    selector = selectors.DefaultSelector()
+    selector.register(server, selectors.EVENT_READ, handle_client_connection)
+    if daemon_display is not None:
+        selector.register(daemon_display.fileno(), selectors.EVENT_READ, handle_x_events)
+
+    try:
+        while True:
+            for key, _events in selector.select():
+                key.data()
+    finally:
+        selector.close()
+        server.close()
+        if daemon_display is not None:
+            daemon_display.close()
+        try:
+            os.unlink(socket_path)
+        except OSError:
+            pass
+
+
+# Run when directly called
+if __name__ == "__main__":
+    cli_argv = sys.argv[1:]
+    if "-D" in cli_argv or "--daemon" in cli_argv:
+        run_daemon()
+    elif send_command_to_daemon(cli_argv):
+        pass  # A running daemon has taken the job - nothing left to do here
     else:
-        run_layout(layout=layout_name, override_kwargs=args)
+        sys.exit(dispatch_command(cli_argv))